@@ -1,12 +1,32 @@
+"""
+Shan Dictionary Syllable Verification
+Filters shan_dictionary.json syllables down to those found in dictionary.txt
+
+Requirements (optional, streams syllables instead of loading the whole JSON):
+pip install ijson
+
+Usage:
+python data_verrified.py
+"""
+
 import json
 import os
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Malformed JSON is reported the same way whether it was streamed or loaded whole
+JSON_PARSE_ERRORS = (json.JSONDecodeError,) if ijson is None else (json.JSONDecodeError, ijson.JSONError)
+
 def load_dictionary(dictionary_file):
     """Load dictionary words from text file into a set for fast lookup."""
     try:
         with open(dictionary_file, 'r', encoding='utf-8') as f:
-            # Read all words and convert to lowercase, strip whitespace
-            dictionary_words = set(word.strip().lower() for word in f.readlines() if word.strip())
+            # Lowercase the whole file in one call, then split and strip lines in C
+            dictionary_words = set(map(str.strip, f.read().lower().splitlines()))
+        dictionary_words.discard('')
         print(f"Loaded {len(dictionary_words)} words from dictionary")
         return dictionary_words
     except FileNotFoundError:
@@ -16,22 +36,80 @@ def load_dictionary(dictionary_file):
         print(f"Error reading dictionary file: {e}")
         return None
 
-def filter_syllables_by_dictionary(json_data, dictionary_words):
-    """Filter syllables to keep only those found in dictionary."""
+def iter_syllables(json_file):
+    """Stream syllable entries one at a time without parsing the whole document."""
+    with open(json_file, 'rb') as f:
+        # use_float keeps non-integer numbers as float; json.dump cannot write Decimal
+        yield from ijson.items(f, 'syllables.item', use_float=True)
+
+def leading_keys(json_file):
+    """Walk parse events up to the 'syllables' key without building any values.
+    
+    Returns the top-level keys that come before 'syllables' and whether that key
+    is present at all.
+    """
+    keys = []
+    with open(json_file, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == '' and event == 'map_key':
+                if value == 'syllables':
+                    return keys, True
+                keys.append(value)
+    return keys, False
+
+def load_json_data(json_file):
+    """Load metadata and words, streaming syllables lazily when ijson is available.
+    
+    With ijson, top-level values after 'syllables' are not read.
+    """
+    if ijson is None:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    # Build the values before 'syllables' in one forward pass and stop after the
+    # last of them, before the parser reaches the syllables array
+    keys, has_syllables = leading_keys(json_file)
+    json_data = {}
+    if keys:
+        with open(json_file, 'rb') as f:
+            for i, (key, value) in enumerate(ijson.kvitems(f, '', use_float=True), 1):
+                json_data[key] = value
+                if i == len(keys):
+                    break
+    if has_syllables:
+        json_data['syllables'] = iter_syllables(json_file)
+    return json_data
+
+def filter_syllables_by_dictionary(json_data, dictionary_words, verbose=False, removed_sample_size=50):
+    """Filter syllables to keep only those found in dictionary.
+    
+    When verbose is set, the first removed_sample_size removed entries are kept
+    for the debug listing; the rest are only counted.
+    """
     if 'syllables' not in json_data:
         print("No 'syllables' key found in JSON data")
         return json_data
     
-    original_syllable_count = len(json_data['syllables'])
     filtered_syllables = []
     removed_syllables = []
+    removed_count = 0
+    syllables_with_frequency = 0
     
+    # Single pass over a possibly lazy stream, with lookups bound locally
+    in_dictionary = dictionary_words.__contains__
+    keep_syllable = filtered_syllables.append
+    lower = str.lower
     for syllable_entry in json_data['syllables']:
-        syllable = syllable_entry['syllable'].lower()
-        if syllable in dictionary_words:
-            filtered_syllables.append(syllable_entry)
+        if in_dictionary(lower(syllable_entry['syllable'])):
+            keep_syllable(syllable_entry)
+            if syllable_entry['frequency'] > 0:
+                syllables_with_frequency += 1
         else:
-            removed_syllables.append(syllable_entry)
+            removed_count += 1
+            if verbose and len(removed_syllables) < removed_sample_size:
+                removed_syllables.append(syllable_entry)
+    
+    original_syllable_count = len(filtered_syllables) + removed_count
     
     # Update the JSON data
     json_data['syllables'] = filtered_syllables
@@ -44,14 +122,11 @@ def filter_syllables_by_dictionary(json_data, dictionary_words):
         # Count words with frequency > 0
         words_with_frequency = 0
         if 'words' in json_data:
-            words_with_frequency = sum(1 for word_entry in json_data['words'] if word_entry['frequency'] > 0)
+            words_with_frequency = len([word_entry for word_entry in json_data['words'] if word_entry['frequency'] > 0])
         
         # Count total syllables (number of syllable entries after filtering)
         total_syllables = len(filtered_syllables)
         
-        # Count syllables with frequency > 0
-        syllables_with_frequency = sum(1 for syllable_entry in filtered_syllables if syllable_entry['frequency'] > 0)
-        
         # Update metadata
         json_data['metadata']['total_words'] = total_words
         json_data['metadata']['words_with_frequency'] = words_with_frequency
@@ -61,11 +136,11 @@ def filter_syllables_by_dictionary(json_data, dictionary_words):
     
     print(f"Original syllables: {original_syllable_count}")
     print(f"Filtered syllables: {len(filtered_syllables)}")
-    print(f"Removed syllables: {len(removed_syllables)}")
+    print(f"Removed syllables: {removed_count}")
     
     if removed_syllables:
-        print("\nFirst 10 removed syllables:")
-        for i, syllable in enumerate(removed_syllables[:50]):
+        print(f"\nFirst {len(removed_syllables)} removed syllables:")
+        for syllable in removed_syllables:
             print(f"  - {syllable['syllable']} (frequency: {syllable['frequency']})")
     
     # Print updated metadata
@@ -98,28 +173,25 @@ def main():
     if dictionary_words is None:
         return
     
-    # Load JSON data
+    # Load JSON data, then filter syllables (streamed from disk when ijson is available)
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
+        json_data = load_json_data(json_file)
         print(f"Loaded JSON data from '{json_file}'")
+        filtered_data = filter_syllables_by_dictionary(json_data, dictionary_words, verbose=True)
     except FileNotFoundError:
         print(f"Error: JSON file '{json_file}' not found")
         return
-    except json.JSONDecodeError as e:
+    except JSON_PARSE_ERRORS as e:
         print(f"Error parsing JSON file: {e}")
         return
     except Exception as e:
         print(f"Error reading JSON file: {e}")
         return
     
-    # Filter syllables
-    filtered_data = filter_syllables_by_dictionary(json_data, dictionary_words)
-    
     # Save filtered data
     try:
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(filtered_data, f, indent=2, ensure_ascii=False)
+            json.dump(filtered_data, f, ensure_ascii=False, separators=(',', ':'))
         print(f"\nFiltered data saved to '{output_file}'")
     except Exception as e:
         print(f"Error saving filtered data: {e}")
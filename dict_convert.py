@@ -8,20 +8,27 @@ Requirements:
 pip install datasets transformers shannlp
 
 Usage:
-python shan_dict_converter.py
+python shan_dict_converter.py [--dictionary-syllables-only]
 """
 
+import argparse
 import json
+import os
 import re
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Optional, Tuple, Set
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Fallback tokenizer cleanup: anything outside the Myanmar/Shan blocks and whitespace
+_FALLBACK_RE = re.compile(r'[^\u1000-\u109F\u1A20-\u1AAF\s]')
+
 try:
     from datasets import load_dataset
     from shannlp import word_tokenize, syllable_tokenize
@@ -31,12 +38,40 @@ except ImportError as e:
     exit(1)
 
 
+def _available_cpu_count() -> int:
+    """Number of CPUs this process may run on, honouring CPU affinity where supported."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# Converter shared with each worker process, set once by the pool initializer
+_worker_converter = None
+
+
+def _init_worker(converter: "ShanDictionaryConverter"):
+    """Store the converter in a worker process so it is not re-pickled per chunk."""
+    global _worker_converter
+    _worker_converter = converter
+
+
+def _count_tokens_in_worker(texts: List[str]) -> Counter:
+    """Count tokens for a chunk of articles inside a worker process."""
+    return _worker_converter.count_tokens(texts)
+
+
 class ShanDictionaryConverter:
     """Convert Shan dictionary.txt to structured JSON with frequency analysis."""
     
-    def __init__(self, dict_file: str = "dictionary.txt", output_file: str = "shan_dictionary.json"):
+    def __init__(self, dict_file: str = "dictionary.txt", output_file: str = "shan_dictionary.json",
+                 workers: Optional[int] = None, dictionary_syllables_only: bool = False):
+        if workers is not None and workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        
         self.dict_file = Path(dict_file)
         self.output_file = Path(output_file)
+        self.workers = workers
+        self.dictionary_syllables_only = dictionary_syllables_only
         self.tokenizer = None
         self.syllable_segmenter = None
         self.dictionary_words = []
@@ -128,9 +163,7 @@ class ShanDictionaryConverter:
         
         # Fallback: simple whitespace tokenization with basic Shan text cleaning
         # Remove common punctuation and split on whitespace
-        cleaned_text = re.sub(r'[^\u1000-\u109F\u1A20-\u1AAF\s]', ' ', text)
-        tokens = cleaned_text.split()
-        return [token.strip() for token in tokens if token.strip()]
+        return _FALLBACK_RE.sub(' ', text).split()
     
     def segment_syllables(self, word: str) -> List[str]:
         """Segment Shan word into syllables using ShanNLP or fallback."""
@@ -143,32 +176,72 @@ class ShanDictionaryConverter:
         # Fallback: treat each word as a single syllable
         return [word] if word else []
     
-    def analyze_frequency(self, texts: List[str]) -> Tuple[Counter, Counter]:
+    def tokenize_chunk(self, texts: List[str]) -> List[str]:
+        """Tokenize a chunk of articles, with one tokenizer call when possible."""
+        # Only counts are needed, so tokenize the whole chunk in one call; a space
+        # separator keeps article boundaries as token boundaries and is dropped
+        joined_text = " ".join(texts)
+        if not self.tokenizer:
+            return self.tokenize_text(joined_text)
+        
+        try:
+            return self.tokenizer(joined_text, engine="newmm", keep_whitespace=False)
+        except Exception as e:
+            logger.warning(f"ShanNLP tokenization failed for a chunk of {len(texts)} articles: {e}")
+            logger.warning("Retrying the chunk one article at a time...")
+        
+        # Keep the fallback per article so one bad article does not degrade the whole chunk
+        return [token for text in texts for token in self.tokenize_text(text)]
+    
+    def count_tokens(self, texts: List[str]) -> Counter:
+        """Count raw tokens for a chunk of articles."""
+        # Tokenize the whole chunk at once; only aggregate counts are needed
+        return Counter(self.tokenize_chunk(texts))
+    
+    def analyze_frequency(self, texts: List[str], chunk_size: int = 256) -> Tuple[Counter, Counter]:
         """Phase 2: Analyze word and syllable frequencies from corpus."""
         logger.info("Phase 2: Analyzing frequencies from corpus...")
         
         word_counter = Counter()
         syllable_counter = Counter()
+        token_counter = Counter()
         
         # Create set of dictionary words for faster lookup
         dict_word_set = set(self.dictionary_words)
         
-        for i, text in enumerate(texts):
-            if i % 100 == 0:
-                logger.info(f"Processing article {i}/{len(texts)}")
-            
-            # Tokenize text
-            tokens = self.tokenize_text(text)
-            
-            # Count word frequencies (only for words in dictionary)
-            for token in tokens:
-                if token in dict_word_set:
-                    word_counter[token] += 1
-                
-                # Segment into syllables and count
-                syllables = self.segment_syllables(token)
-                for syllable in syllables if syllables else [token]:
-                    syllable_counter[syllable] += 1
+        # Articles are independent, so tokenize chunks of them in parallel and merge the Counters
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        workers = self.workers if self.workers is not None else _available_cpu_count()
+        logger.info(f"Counting {len(chunks)} chunks of up to {chunk_size} articles with {workers} workers")
+        
+        if workers == 1:
+            results = map(self.count_tokens, chunks)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,))
+            results = executor.map(_count_tokens_in_worker, chunks)
+        
+        try:
+            processed = 0
+            for chunk, chunk_tokens in zip(chunks, results):
+                token_counter.update(chunk_tokens)
+                processed += len(chunk)
+                logger.info(f"Processed article {processed}/{len(texts)}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        # Keep word frequencies only for words in dictionary
+        word_counter.update({token: token_counter[token] for token in token_counter.keys() & dict_word_set})
+        
+        # Segmentation is pure, so segment each distinct token in the corpus once and
+        # weight its syllables by the token's occurrence count (optionally only
+        # dictionary words, skipping out-of-vocabulary tokens entirely)
+        for token, count in token_counter.items():
+            if self.dictionary_syllables_only and token not in dict_word_set:
+                continue
+            for syllable in self.segment_syllables(token) or [token]:
+                syllable_counter[syllable] += count
         
         logger.info(f"Found frequencies for {len(word_counter)} dictionary words")
         logger.info(f"Found {len(syllable_counter)} unique syllables")
@@ -179,18 +252,22 @@ class ShanDictionaryConverter:
         """Phase 3: Update JSON with real frequency data."""
         logger.info("Phase 3: Updating JSON with frequency data...")
         
-        # Update word frequencies
+        # Update word frequencies and count the nonzero ones in the same pass;
+        # word_frequencies only holds dictionary words seen in the corpus
+        get_frequency = word_frequencies.get
+        words_with_frequency = 0
         for word_entry in basic_json["words"]:
-            word = word_entry["word"]
-            word_entry["frequency"] = word_frequencies.get(word, 0)
+            frequency = get_frequency(word_entry["word"], 0)
+            word_entry["frequency"] = frequency
+            words_with_frequency += frequency > 0
         
         # Sort words by frequency (descending)
-        basic_json["words"].sort(key=lambda x: x["frequency"], reverse=True)
+        basic_json["words"].sort(key=itemgetter("frequency"), reverse=True)
         
         # Update metadata
         basic_json["metadata"].update({
             "phase": "frequency_analysis_complete",
-            "words_with_frequency": sum(1 for w in basic_json["words"] if w["frequency"] > 0),
+            "words_with_frequency": words_with_frequency,
             "total_syllables": len(syllable_frequencies)
         })
         
@@ -286,7 +363,12 @@ class ShanDictionaryConverter:
 
 def main():
     """Main function to run the converter."""
-    converter = ShanDictionaryConverter()
+    parser = argparse.ArgumentParser(description="Convert Shan dictionary.txt to structured JSON with frequency analysis")
+    parser.add_argument("--dictionary-syllables-only", action="store_true",
+                        help="segment only dictionary words when counting syllables (default: every corpus token)")
+    args = parser.parse_args()
+    
+    converter = ShanDictionaryConverter(dictionary_syllables_only=args.dictionary_syllables_only)
     converter.run_conversion()
 
 